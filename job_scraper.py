@@ -1,16 +1,27 @@
 import requests
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from requests.adapters import HTTPAdapter
+import lxml.etree
+import lxml.html
+from lxml.cssselect import CSSSelector
 import time
 import os
 from datetime import datetime
 import urllib.parse
 import random
+import multiprocessing
+from multiprocessing.util import Finalize
+import functools
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import io
+import codecs
+import json
+import types
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
 
 # ALL CONFIG FROM GITHUB SECRETS
 SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL")
@@ -18,49 +29,271 @@ JOB_TITLE = os.environ.get("JOB_TITLE")
 LOCATIONS_STRING = os.environ.get("JOB_LOCATIONS")
 DOMAINS_STRING = os.environ.get("DOMAIN_MAPPINGS")
 MAX_JOBS_PER_LOCATION = int(os.environ.get("MAX_JOBS_PER_LOCATION", "10"))
+MAX_SCRAPER_WORKERS = int(os.environ.get("MAX_SCRAPER_WORKERS") or "4")
+DEBUG_SCREENSHOTS = os.environ.get("DEBUG_SCREENSHOTS") == "1"
+# Optional: webhooks cannot carry files, so screenshots need a bot token
+SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
+SLACK_CHANNEL_ID = os.environ.get("SLACK_CHANNEL_ID")
+SCREENSHOT_HEIGHT = 600
 
 # Validate
 if not all([SLACK_WEBHOOK_URL, JOB_TITLE, LOCATIONS_STRING, DOMAINS_STRING]):
     raise ValueError("Required configuration missing")
 
-# Parse locations
-LOCATIONS = [loc.strip() for loc in LOCATIONS_STRING.split(",")]
+# Parse locations (read-only for the rest of the run)
+LOCATIONS = tuple(loc.strip() for loc in LOCATIONS_STRING.split(","))
 
 # Parse domain mappings from secret
-DOMAINS = {}
+_domains = {}
 for mapping in DOMAINS_STRING.split(","):
     if ":" in mapping:
         country, domain = mapping.split(":", 1)
-        DOMAINS[country.strip().lower()] = domain.strip()
+        _domains[country.strip().lower()] = domain.strip()
+DOMAINS = types.MappingProxyType(_domains)
+
+# Longest keys first so "united kingdom" wins over "united"
+DOMAIN_LOOKUP = tuple(sorted(DOMAINS.items(), key=lambda kv: -len(kv[0])))
 
 print(f"Configuration loaded: {len(LOCATIONS)} targets")
 print(f"Searching for: '{JOB_TITLE}'")
 
+# The job title is the same for every location, so encode it once
+_Q = urllib.parse.quote_plus(JOB_TITLE)
+_URL_TMPL = "https://{domain}/jobs?q=" + _Q + "&l={l}&sort=date&fromage=7"
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+)
+
+# Plain HTTP client used before falling back to a real browser
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update({
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+})
+
+# Keep-alive connection for Slack webhook posts; all posts now come
+# sequentially from the parent process, so one pooled connection is enough
+SLACK_SESSION = requests.Session()
+SLACK_SESSION.mount("https://hooks.slack.com", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+SLACK_SESSION.headers.update({"User-Agent": "job-scraper"})
+
+# Subresources the browser never needs to fetch
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp",
+    "*.css",
+    "*.woff", "*.woff2", "*.ttf",
+    "*googletagmanager*", "*google-analytics*", "*doubleclick*",
+]
+
+# Slack rejects messages with more blocks than this
+SLACK_MAX_BLOCKS = 50
+# Section text is capped at 3000 chars; leave room for the debug header
+DEBUG_MSG_MAX_CHARS = 2500
+# Seconds to wait on each Slack file upload call
+SLACK_UPLOAD_TIMEOUT = 30
+
+# Debug entries collected during the run, reported in the final message
+DEBUG_QUEUE = []
+
+# Card selectors, tried in order of preference
+CARD_SELECTORS = [
+    ".css-ehf62e.eu4oa1w0",
+    ".job_seen_beacon",
+    ".cardOutline",
+    ".slider_item",
+    ".resultContent",
+    "li[data-jk]",
+    "div[data-jk]",
+    "td.resultContent"
+]
+
+NO_RESULTS_SELECTOR = ".jobsearch-NoResult-messageHeader"
+
+# Field selector alternatives. Each list is matched as one combined query,
+# so an entry that a broader one already covers only adds work.
+TITLE_SELECTORS = [
+    "h2 span[title]",
+    "h2.jobTitle",
+    "a.jcs-JobTitle span",
+    ".jobTitle span"
+]
+
+COMPANY_SELECTORS = [
+    "[data-testid='company-name']",
+    ".companyName"
+]
+
+LOCATION_SELECTORS = [
+    "[data-testid='text-location']",
+    ".companyLocation"
+]
+
+SALARY_SELECTORS = [
+    "[data-testid='attribute_snippet_testid']",
+    ".salary-snippet-container",
+    ".salary-snippet"
+]
+
+# Each field is looked up with a single combined CSS "or" query, compiled
+# to XPath once here rather than on every card
+_CARD_SELS = [(s, CSSSelector(s, translator="html")) for s in CARD_SELECTORS]
+_TITLE_SEL = CSSSelector(", ".join(TITLE_SELECTORS), translator="html")
+_COMPANY_SEL = CSSSelector(", ".join(COMPANY_SELECTORS), translator="html")
+_LOCATION_SEL = CSSSelector(", ".join(LOCATION_SELECTORS), translator="html")
+_SALARY_SEL = CSSSelector(", ".join(SALARY_SELECTORS), translator="html")
+_NO_RESULTS_SEL = CSSSelector(NO_RESULTS_SELECTOR, translator="html")
+_LINK_SEL = CSSSelector("h2.jobTitle a, a.jcs-JobTitle", translator="html")
+
 
 # SLACK FUNCTIONS
-def send_debug_screenshot(screenshot_b64, location, error_msg):
-    """Send debug screenshot to Slack when scraping fails"""
-    try:
-        message = {
-            "text": f"Debug Info for {location}",
-            "blocks": [
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*Debug Info - {location}*\n{error_msg}\n\n_Screenshot shows what the bot sees_"
-                    }
-                }
-            ],
-            "username": "Debug Bot"
+def queue_debug_screenshot(screenshot_png, location, error_msg):
+    """Queue debug screenshot for the final Slack report when scraping fails"""
+    DEBUG_QUEUE.append((location, error_msg, screenshot_png))
+
+
+def _can_upload_files():
+    """Whether Slack file uploads are configured"""
+    return bool(SLACK_BOT_TOKEN and SLACK_CHANNEL_ID)
+
+
+def _debug_block(location, error_msg, uploaded):
+    """Build the Slack section block for a queued debug entry"""
+    footer = "\n\n_Screenshot of what the bot sees was uploaded separately_" if uploaded else ""
+    # Driver errors can embed long stack traces; an oversized section would
+    # make Slack reject the whole report, job listings included
+    if len(error_msg) > DEBUG_MSG_MAX_CHARS:
+        error_msg = error_msg[:DEBUG_MSG_MAX_CHARS] + "…"
+    return {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": f"*Debug Info - {location}*\n{error_msg}{footer}"
         }
-        requests.post(SLACK_WEBHOOK_URL, json=message)
-        print(f"  Debug info sent to Slack")
+    }
+
+
+def upload_screenshot(location, screenshot_png):
+    """Upload a debug screenshot with Slack's external file upload flow
+
+    Returns True when Slack confirmed the upload.
+    """
+    headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
+    try:
+        ticket = SLACK_SESSION.post(
+            "https://slack.com/api/files.getUploadURLExternal",
+            headers=headers,
+            data={"filename": "debug.png", "length": len(screenshot_png)},
+            timeout=SLACK_UPLOAD_TIMEOUT,
+        ).json()
+        if not ticket.get("ok"):
+            print(f"  Screenshot upload failed for {location}: {ticket.get('error')}")
+            return False
+
+        SLACK_SESSION.post(
+            ticket["upload_url"], data=screenshot_png, timeout=SLACK_UPLOAD_TIMEOUT
+        ).raise_for_status()
+
+        result = SLACK_SESSION.post(
+            "https://slack.com/api/files.completeUploadExternal",
+            headers=headers,
+            data={
+                "files": json.dumps([{"id": ticket["file_id"], "title": f"Debug - {location}"}]),
+                "channel_id": SLACK_CHANNEL_ID,
+            },
+            timeout=SLACK_UPLOAD_TIMEOUT,
+        ).json()
+        if not result.get("ok"):
+            print(f"  Screenshot upload failed for {location}: {result.get('error')}")
+            return False
     except Exception as e:
-        print(f"  Failed to send debug screenshot: {e}")
+        print(f"  Screenshot upload failed for {location}: {e}")
+        return False
+
+    return True
+
+
+def upload_debug_screenshots():
+    """Upload the screenshots of all queued debug entries
+
+    Returns the DEBUG_QUEUE indices whose screenshot Slack confirmed.
+    """
+    screenshots = [(i, location, png) for i, (location, _, png) in enumerate(DEBUG_QUEUE) if png]
+    if not screenshots:
+        return set()
+    if not _can_upload_files():
+        print("Skipping screenshot upload: SLACK_BOT_TOKEN or SLACK_CHANNEL_ID not set")
+        return set()
+
+    uploaded = {i for i, location, png in screenshots if upload_screenshot(location, png)}
+    print(f"Uploaded {len(uploaded)}/{len(screenshots)} debug screenshots")
+    return uploaded
+
+
+def _job_block(job_number, job):
+    """Build the Slack section block for a single job"""
+    job_block = {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": f"*{job_number}. {job['title']}*\n"
+            f"Company: {job['company']}\n"
+            f"Location: {job['location']}\n"
+            f"Salary: {job['salary']}",
+        },
+    }
+
+    if job.get("link"):
+        job_block["accessory"] = {
+            "type": "button",
+            "text": {"type": "plain_text", "text": "Apply", "emoji": True},
+            "url": job["link"],
+            "action_id": f"button_{job_number}"
+        }
+
+    return job_block
 
 
-def send_to_slack(all_jobs_by_location, debug_info=None):
+def _result_blocks(all_jobs_by_location):
+    """Yield each location's header followed by its numbered job blocks"""
+    job_numbers = itertools.count(1)
+    for location, jobs in all_jobs_by_location.items():
+        if not jobs:
+            continue
+        yield {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*{location}* - {len(jobs)} jobs"
+            }
+        }
+        yield from (_job_block(next(job_numbers), job) for job in jobs)
+
+
+def _debug_blocks(uploaded_screenshots):
+    """Yield a divider and section for every queued debug entry"""
+    return itertools.chain.from_iterable(
+        ({"type": "divider"}, _debug_block(location, error_msg, i in uploaded_screenshots))
+        for i, (location, error_msg, _) in enumerate(DEBUG_QUEUE)
+    )
+
+
+def post_to_slack(message):
+    """Post a message, split over several posts if it exceeds the block limit"""
+    blocks = message.get("blocks")
+    if not blocks:
+        return [SLACK_SESSION.post(SLACK_WEBHOOK_URL, json=message)]
+
+    # The header lands in the first post and the footer in the last
+    return [
+        SLACK_SESSION.post(SLACK_WEBHOOK_URL, json={**message, "blocks": blocks[i:i + SLACK_MAX_BLOCKS]})
+        for i in range(0, len(blocks), SLACK_MAX_BLOCKS)
+    ]
+
+
+def send_to_slack(all_jobs_by_location, debug_info=None, uploaded_screenshots=frozenset()):
     """Send results to notification system"""
 
     total_jobs = sum(len(jobs) for jobs in all_jobs_by_location.values())
@@ -74,7 +307,12 @@ def send_to_slack(all_jobs_by_location, debug_info=None):
             "text": f"No matching results found.{debug_text}", 
             "username": "Job Alert Bot"
         }
-        requests.post(SLACK_WEBHOOK_URL, json=message)
+        if DEBUG_QUEUE:
+            message["blocks"] = [
+                {"type": "section", "text": {"type": "mrkdwn", "text": message["text"]}},
+                *_debug_blocks(uploaded_screenshots),
+            ]
+        post_to_slack(message)
         return
 
     blocks = [
@@ -97,82 +335,205 @@ def send_to_slack(all_jobs_by_location, debug_info=None):
     ]
 
     # Add all results
-    job_number = 1
-    for location, jobs in all_jobs_by_location.items():
-        if jobs:
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*{location}* - {len(jobs)} jobs"
-                }
-            })
-            
-        for job in jobs:
-            job_block = {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*{job_number}. {job['title']}*\n"
-                    f"Company: {job['company']}\n"
-                    f"Location: {job['location']}\n"
-                    f"Salary: {job['salary']}",
-                },
-            }
-
-            if job.get("link"):
-                job_block["accessory"] = {
-                    "type": "button",
-                    "text": {"type": "plain_text", "text": "Apply", "emoji": True},
-                    "url": job["link"],
-                    "action_id": f"button_{job_number}"
-                }
-
-            blocks.append(job_block)
-            job_number += 1
+    blocks.extend(_result_blocks(all_jobs_by_location))
+    blocks.extend(_debug_blocks(uploaded_screenshots))
 
+    location_count = sum(1 for jobs in all_jobs_by_location.values() if jobs)
     blocks.append({"type": "divider"})
     blocks.append(
         {
             "type": "section",
-            "text": {"type": "mrkdwn", "text": f"*Total: {total_jobs} jobs across {len([j for j in all_jobs_by_location.values() if j])} locations*"},
+            "text": {"type": "mrkdwn", "text": f"*Total: {total_jobs} jobs across {location_count} locations*"},
         }
     )
 
     message = {"blocks": blocks, "username": "Job Alert Bot"}
-    response = requests.post(SLACK_WEBHOOK_URL, json=message)
+    responses = post_to_slack(message)
 
-    if response.status_code == 200:
-        print(f"Notification sent: {total_jobs} jobs")
+    failed = [response.status_code for response in responses if response.status_code != 200]
+    if not failed:
+        print(f"Notification sent: {total_jobs} jobs in {len(responses)} message(s)")
     else:
-        print(f"Notification failed: {response.status_code}")
+        print(f"Notification failed: {', '.join(map(str, failed))}")
 
 
 # CORE FUNCTIONS
+@functools.lru_cache(maxsize=128)
 def get_domain(location):
     """Get domain from configuration"""
     location_lower = location.lower()
-    for key, domain in DOMAINS.items():
-        if key in location_lower:
-            return domain
-    return "www.indeed.com"
+    return next((domain for key, domain in DOMAIN_LOOKUP if key in location_lower), "www.indeed.com")
 
 
-def build_search_url(domain, job_title, location):
+def build_search_url(domain, location):
     """Build Indeed search URL directly"""
-    q = urllib.parse.quote_plus(job_title)
-    l = urllib.parse.quote_plus(location)
-    url = f"https://{domain}/jobs?q={q}&l={l}&sort=date&fromage=7"
-    return url
+    return _URL_TMPL.format(domain=domain, l=urllib.parse.quote_plus(location))
 
 
-def scrape_location(location):
-    """Execute search by directly navigating to search results URL"""
-    print(f"\n{'='*50}")
-    print(f"Processing: {location}")
-    print(f"{'='*50}")
+def is_blocked(url):
+    """Check whether a URL points at a captcha or block page"""
+    url_lower = url.lower()
+    return "showcaptcha" in url_lower or "blocked" in url_lower
+
+
+def fetch_search_page(url):
+    """Fetch search results HTML without a browser
+
+    Returns (body bytes, declared charset or None), or None if blocked.
+    """
+    try:
+        response = HTTP_SESSION.get(url, timeout=15)
+    except requests.RequestException as e:
+        print(f"  HTTP fetch failed: {e}")
+        return None
+
+    if response.status_code != 200 or is_blocked(response.url):
+        print(f"  HTTP fetch blocked: {response.status_code} {response.url}")
+        return None
+
+    # Hand raw bytes to lxml rather than decoding to str up front. Only pass
+    # on a charset the server actually declared; otherwise requests would
+    # report its ISO-8859-1 default and lxml should use <meta charset>
+    content_type = response.headers.get("Content-Type", "").lower()
+    encoding = response.encoding if "charset=" in content_type else None
+    if encoding:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            print(f"  Ignoring unknown charset: {encoding}")
+            encoding = None
+    return response.content, encoding
+
+
+def _first_match(card, selector, attribute=None):
+    """Return stripped text of the first element matching selector in card"""
+    elems = selector(card)
+    # Combined selectors match in document order, so prefer the attribute
+    # on any element before falling back to text content
+    if attribute:
+        for elem in elems:
+            value = elem.get(attribute)
+            if value and value.strip():
+                return value.strip()
+    for elem in elems:
+        value = elem.text_content()
+        if value and value.strip():
+            return value.strip()
+    return None
+
+
+def parse_job_cards(html, domain, location, encoding=None):
+    """Extract jobs from search results HTML
+
+    Returns (jobs, no_results) where no_results is True when the page is
+    Indeed's genuine "no jobs found" page rather than a missing card list.
+    """
+    try:
+        try:
+            parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+        except LookupError:
+            # Charset Python knows but libxml2 does not; use <meta charset>
+            parser = None
+        tree = lxml.html.fromstring(html, parser=parser)
+    except lxml.etree.ParserError as e:
+        # Anti-bot interstitials can return a blank or comment-only body
+        print(f"  Could not parse HTML: {e}")
+        return [], False
+
+    cards = []
+    for selector, compiled in _CARD_SELS:
+        cards = compiled(tree)
+        if cards:
+            print(f"  Found {len(cards)} job cards using CSS selector: {selector}")
+            break
+
+    if not cards and _NO_RESULTS_SEL(tree):
+        return [], True
+
+    return parse_cards(cards, domain, location), False
+
+
+def parse_cards(cards, domain, location):
+    """Extract jobs from parsed job card elements"""
+    jobs = []
+    for idx, card in enumerate(cards[:MAX_JOBS_PER_LOCATION], 1):
+        title = _first_match(card, _TITLE_SEL, attribute="title")
+        if not title:
+            print(f"    Job {idx}: No title found, skipping")
+            continue
+
+        link = None
+        job_id = card.get("data-jk")
+        if not job_id:
+            link_elems = _LINK_SEL(card)
+            if link_elems:
+                job_id = link_elems[0].get("data-jk")
+        if job_id:
+            link = f"https://{domain}/viewjob?jk={job_id}"
+
+        jobs.append({
+            "title": title,
+            "company": _first_match(card, _COMPANY_SEL) or "Not listed",
+            "location": _first_match(card, _LOCATION_SEL) or location,
+            "salary": _first_match(card, _SALARY_SEL) or "Not listed",
+            "link": link,
+        })
+
+        print(f"    Job {idx}: {title[:50]}...")
+
+    return jobs
+
+
+# Runs in the browser: outerHTML of the first matching card set, truncated
+CARDS_HTML_JS = """
+const [selectors, limit] = arguments;
+for (const selector of selectors) {
+    const cards = document.querySelectorAll(selector);
+    if (cards.length) {
+        return Array.from(cards).slice(0, limit).map(card => card.outerHTML);
+    }
+}
+return [];
+"""
+
+
+def capture_screenshot(driver):
+    """PNG screenshot of the top of the page, only if DEBUG_SCREENSHOTS=1"""
+    if not DEBUG_SCREENSHOTS:
+        return None
+
+    png = driver.get_screenshot_as_png()
+    if Image is not None:
+        with Image.open(io.BytesIO(png)) as image:
+            top = image.crop((0, 0, image.width, min(image.height, SCREENSHOT_HEIGHT)))
+            buffer = io.BytesIO()
+            top.save(buffer, format="PNG")
+            png = buffer.getvalue()
+
+    # Kept as raw bytes; Slack's upload endpoint takes the PNG as-is
+    return png
+
+
+def extract_cards_html(driver):
+    """Fetch the job cards' markup from the browser in a single call"""
+    return driver.execute_script(CARDS_HTML_JS, CARD_SELECTORS, MAX_JOBS_PER_LOCATION)
+
+
+STEALTH_JS = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+"""
+
+
+def build_driver():
+    """Start a headless Chrome configured to avoid bot detection"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
 
     chrome_options = Options()
+    # Return from get() at DOMContentLoaded; the card wait gates readiness
+    chrome_options.page_load_strategy = "eager"
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
@@ -182,243 +543,226 @@ def scrape_location(location):
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     
-    chrome_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
-    )
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
     
     chrome_options.add_argument("--disable-infobars")
     chrome_options.add_argument("--disable-notifications")
     chrome_options.add_argument("--lang=en-US,en;q=0.9")
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), 
-        options=chrome_options
-    )
+    # Only the DOM is read, so skip downloading and rendering page assets
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-features=Translate,BackForwardCache,IsolateOrigins")
+    # A single-tab scrape gains nothing from a renderer process per site
+    chrome_options.add_argument("--disable-site-isolation-trials")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+        # Indeed needs its session cookies to serve results
+        "profile.default_content_setting_values.cookies": 1,
+    })
+
+    # Selenium Manager resolves and caches a matching chromedriver
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.set_page_load_timeout(15)
+    # Lookups must fail fast; readiness is handled by the explicit card wait
+    driver.implicitly_wait(0)
     
     # Advanced bot detection avoidance
-    driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-        "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
-    })
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    driver.execute_script("Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})")
-    driver.execute_script("Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})")
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": USER_AGENT})
+    # Registered once, applied to every page this long-lived session loads
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_JS})
+
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
 
+    return driver
+
+
+# Per-process browser, reused for every location a worker handles
+_DRIVER = None
+
+
+def get_driver():
+    """Return this process's browser, starting it on first use"""
+    global _DRIVER
+    if _DRIVER is None:
+        _DRIVER = build_driver()
+    return _DRIVER
+
+
+def quit_driver():
+    """Shut down this process's browser if one is running"""
+    global _DRIVER
+    if _DRIVER is not None:
+        try:
+            _DRIVER.quit()
+        except Exception:
+            pass
+        _DRIVER = None
+
+
+# Shared between worker processes: domain -> earliest next request time
+_NEXT_ALLOWED = None
+_RATE_LOCK = None
+
+
+def init_worker(next_allowed, rate_lock):
+    """Worker initializer: share the rate limiter and quit Chrome on exit"""
+    global _NEXT_ALLOWED, _RATE_LOCK
+    _NEXT_ALLOWED = next_allowed
+    _RATE_LOCK = rate_lock
+    Finalize(None, quit_driver, exitpriority=10)
+
+
+def wait_for_domain(domain):
+    """Space out requests to the same domain, even across workers"""
+    with _RATE_LOCK:
+        now = time.time()
+        start = max(now, _NEXT_ALLOWED.get(domain, 0.0))
+        _NEXT_ALLOWED[domain] = start + random.uniform(3, 7)
+
+    delay = start - now
+    if delay > 0:
+        print(f"  Waiting {delay:.1f}s before next request to {domain}...")
+        time.sleep(delay)
+
+
+def scrape_task(idx, location):
+    """Worker entry point: scrape a location and hand back its debug entries"""
+    DEBUG_QUEUE.clear()
+    try:
+        results = scrape_location(idx, location)
+    except Exception as e:
+        # One bad location must not abort the run and lose everyone's results
+        print(f"  ERROR: {location} failed: {e}")
+        return [], [(location, f"Unexpected error: {e}", None)]
+    return results, list(DEBUG_QUEUE)
+
+
+def scrape_location(idx, location):
+    """Execute search by directly navigating to search results URL"""
+    print(f"\n{'='*50}")
+    print(f"[{idx}/{len(LOCATIONS)}] Processing: {location}")
+    print(f"{'='*50}")
+
+    domain = get_domain(location)
+    url = build_search_url(domain, location)
+
+    print(f"  Domain: {domain}")
+    print(f"  Searching for: '{JOB_TITLE}'")
+    print(f"  Location: '{location}'")
+    print(f"  URL: {url}")
+
+    wait_for_domain(domain)
+
+    # Indeed's results page is server-rendered, so try a plain GET first
+    page = fetch_search_page(url)
+    if page:
+        html, encoding = page
+        results, no_results = parse_job_cards(html, domain, location, encoding)
+        if no_results:
+            print(f"  Indeed shows 'No jobs found', skipping browser")
+            return []
+        if results:
+            print(f"  Successfully scraped {len(results)} jobs without browser")
+            return results
+        print(f"  No jobs in static HTML, falling back to browser")
+
+    # Selenium is only imported once a location actually needs the browser;
+    # runs served entirely over plain HTTP never pay for it
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
+    driver = None
     results = []
     debug_messages = []
 
     try:
-        domain = get_domain(location)
-        url = build_search_url(domain, JOB_TITLE, location)
-        
-        print(f"  Domain: {domain}")
-        print(f"  Searching for: '{JOB_TITLE}'")
-        print(f"  Location: '{location}'")
-        print(f"  URL: {url}")
-        
-        driver.get(url)
+        driver = get_driver()
+        # The browser is shared across locations, so drop the previous session
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+        # The browser hit is a second request to a domain that just pushed back
+        wait_for_domain(domain)
+        try:
+            driver.get(url)
+        except TimeoutException:
+            print(f"  Page load timed out, continuing with partial page")
         
+        # Stop waiting as soon as the page settles into any known outcome:
+        # job cards, Indeed's "no results" banner, or a captcha/block page
         print(f"  Waiting for results to load...")
-        time.sleep(5)
+        try:
+            WebDriverWait(driver, 10, poll_frequency=0.1).until(EC.any_of(
+                *[EC.presence_of_element_located((By.CSS_SELECTOR, s)) for s in CARD_SELECTORS],
+                EC.presence_of_element_located((By.CSS_SELECTOR, NO_RESULTS_SELECTOR)),
+                lambda d: is_blocked(d.current_url),
+            ))
+        except TimeoutException:
+            print(f"  Timed out waiting for job cards")
 
         current_url = driver.current_url
         print(f"  Current URL: {current_url}")
         
-        if "showcaptcha" in current_url.lower() or "blocked" in current_url.lower():
+        if is_blocked(current_url):
+            # The URL and title say enough; skip rasterizing the page
             debug_messages.append("WARNING: Bot detection triggered - captcha or block page")
-            screenshot = driver.get_screenshot_as_base64()
-            send_debug_screenshot(screenshot, location, "\n".join(debug_messages))
-            driver.quit()
+            debug_messages.append(f"Page title: {driver.title}")
+            debug_messages.append(f"URL: {current_url}")
+            queue_debug_screenshot(None, location, "\n".join(debug_messages))
             return results
 
         try:
-            wait = WebDriverWait(driver, 10)
-            
-            job_card_selectors = [
-                "css-ehf62e.eu4oa1w0",
-                "job_seen_beacon",
-                "cardOutline",
-                "slider_item",
-                "resultContent"
-            ]
-            
-            cards = []
-            selector_used = None
-            
-            for selector in job_card_selectors:
-                try:
-                    cards = driver.find_elements(By.CLASS_NAME, selector)
-                    if cards and len(cards) > 0:
-                        selector_used = selector
-                        print(f"  Found {len(cards)} elements with class: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not cards:
-                css_selectors = [
-                    "li[data-jk]",
-                    "div.job_seen_beacon",
-                    "div[data-jk]",
-                    ".cardOutline",
-                    "td.resultContent"
-                ]
-                
-                for selector in css_selectors:
-                    try:
-                        cards = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if cards and len(cards) > 0:
-                            selector_used = selector
-                            print(f"  Found {len(cards)} job cards using CSS selector: {selector}")
-                            break
-                    except:
-                        continue
-            
-            if not cards:
+            # One WebDriver round-trip returns only the cards, parsed in-process
+            cards_html = extract_cards_html(driver)
+            print(f"  Found {len(cards_html)} job cards in browser")
+            cards = lxml.html.fragments_fromstring("".join(cards_html)) if cards_html else []
+            results = parse_cards(cards, domain, location)
+
+            if not results:
                 error_msg = "No job cards found on page"
                 debug_messages.append(f"ERROR: {error_msg}")
                 debug_messages.append(f"Page title: {driver.title}")
                 debug_messages.append(f"URL: {driver.current_url}")
                 
-                try:
-                    no_results = driver.find_elements(By.CSS_SELECTOR, ".jobsearch-NoResult-messageHeader")
-                    if no_results:
-                        debug_messages.append("INFO: Indeed shows 'No jobs found' message")
-                except:
-                    pass
+                # find_elements returns [] immediately instead of raising
+                if driver.find_elements(By.CSS_SELECTOR, NO_RESULTS_SELECTOR):
+                    debug_messages.append("INFO: Indeed shows 'No jobs found' message")
                 
                 print(f"  ERROR: {error_msg}")
-                screenshot = driver.get_screenshot_as_base64()
-                send_debug_screenshot(screenshot, location, "\n".join(debug_messages))
-                driver.quit()
+                screenshot = capture_screenshot(driver)
+                queue_debug_screenshot(screenshot, location, "\n".join(debug_messages))
                 return results
 
-            print(f"  Processing up to {MAX_JOBS_PER_LOCATION} jobs...")
-            
-            for idx, card in enumerate(cards[:MAX_JOBS_PER_LOCATION], 1):
-                try:
-                    title = None
-                    title_selectors = [
-                        "h2.jobTitle span[title]",
-                        "h2.jobTitle a span",
-                        "h2.jobTitle",
-                        "a.jcs-JobTitle span",
-                        ".jobTitle span",
-                        "h2 span[title]"
-                    ]
-                    
-                    for selector in title_selectors:
-                        try:
-                            title_elem = card.find_element(By.CSS_SELECTOR, selector)
-                            title = title_elem.get_attribute("title") or title_elem.text
-                            if title and title.strip():
-                                break
-                        except:
-                            continue
-                    
-                    if not title or not title.strip():
-                        print(f"    Job {idx}: No title found, skipping")
-                        continue
-
-                    company = "Not listed"
-                    company_selectors = [
-                        "[data-testid='company-name']",
-                        "span.companyName",
-                        ".companyName",
-                        "span[data-testid='company-name']"
-                    ]
-                    
-                    for selector in company_selectors:
-                        try:
-                            company_elem = card.find_element(By.CSS_SELECTOR, selector)
-                            company = company_elem.text
-                            if company and company.strip():
-                                break
-                        except:
-                            continue
-
-                    job_location = location
-                    location_selectors = [
-                        "[data-testid='text-location']",
-                        "div.companyLocation",
-                        ".companyLocation",
-                        "div[data-testid='text-location']"
-                    ]
-                    
-                    for selector in location_selectors:
-                        try:
-                            loc_elem = card.find_element(By.CSS_SELECTOR, selector)
-                            job_location = loc_elem.text
-                            if job_location and job_location.strip():
-                                break
-                        except:
-                            continue
-
-                    link = None
-                    try:
-                        job_id = card.get_attribute("data-jk")
-                        if not job_id:
-                            link_elem = card.find_element(By.CSS_SELECTOR, "h2.jobTitle a, a.jcs-JobTitle")
-                            job_id = link_elem.get_attribute("data-jk")
-                        
-                        if job_id:
-                            link = f"https://{domain}/viewjob?jk={job_id}"
-                    except:
-                        pass
-
-                    salary = "Not listed"
-                    salary_selectors = [
-                        "[data-testid='attribute_snippet_testid']",
-                        ".salary-snippet-container",
-                        ".salary-snippet",
-                        "div.salary-snippet",
-                        ".metadata.salary-snippet-container"
-                    ]
-                    
-                    for selector in salary_selectors:
-                        try:
-                            salary_elem = card.find_element(By.CSS_SELECTOR, selector)
-                            salary = salary_elem.text
-                            if salary and salary.strip():
-                                break
-                        except:
-                            continue
-
-                    results.append({
-                        "title": title.strip(),
-                        "company": company.strip(),
-                        "location": job_location.strip(),
-                        "salary": salary.strip(),
-                        "link": link,
-                    })
-                    
-                    print(f"    Job {idx}: {title[:50]}...")
-
-                except Exception as e:
-                    print(f"    Job {idx}: Failed to parse ({str(e)})")
-                    continue
-
             print(f"  Successfully scraped {len(results)} jobs")
 
         except Exception as e:
             error_msg = f"Failed to parse results: {str(e)}"
             debug_messages.append(f"ERROR: {error_msg}")
             print(f"  ERROR: {error_msg}")
-            screenshot = driver.get_screenshot_as_base64()
-            send_debug_screenshot(screenshot, location, "\n".join(debug_messages))
+            try:
+                screenshot = capture_screenshot(driver)
+            except Exception:
+                screenshot = None
+            queue_debug_screenshot(screenshot, location, "\n".join(debug_messages))
+            # The failure may have come from the browser; start a fresh one next time
+            quit_driver()
 
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
         debug_messages.append(f"ERROR: {error_msg}")
         print(f"  ERROR: {error_msg}")
         try:
-            screenshot = driver.get_screenshot_as_base64()
-            send_debug_screenshot(screenshot, location, "\n".join(debug_messages))
-        except:
-            pass
-
-    finally:
-        driver.quit()
+            screenshot = capture_screenshot(driver) if driver else None
+        except Exception:
+            screenshot = None
+        queue_debug_screenshot(screenshot, location, "\n".join(debug_messages))
+        # The browser may be in a bad state; start a fresh one next time
+        quit_driver()
 
     return results
 
@@ -429,37 +773,56 @@ def main():
     print("STARTING JOB SEARCH PROCESS")
     print("="*60)
 
-    all_results = {}
     total_start = time.time()
 
-    for idx, location in enumerate(LOCATIONS, 1):
-        print(f"\n[{idx}/{len(LOCATIONS)}] Target: {location}")
-        results = scrape_location(location)
-        all_results[location] = results
-        
-        if idx < len(LOCATIONS):
-            wait_time = random.uniform(3, 7)
-            print(f"  Waiting {wait_time:.1f}s before next location...")
-            time.sleep(wait_time)
+    # Each worker process drives its own persistent Chrome instance;
+    # WebDriver is not thread-safe but independent processes are fine.
+    workers = max(1, min(len(LOCATIONS), MAX_SCRAPER_WORKERS, os.cpu_count() or 1))
+    print(f"Scraping {len(LOCATIONS)} locations with {workers} workers")
+
+    # Requests are only spaced out per domain, not globally
+    with multiprocessing.Manager() as manager:
+        initargs = (manager.dict(), manager.Lock())
+        # Leaving the block shuts workers down cleanly, so their browsers
+        # are quit by the finalizers registered in init_worker
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=initargs) as executor:
+            all_results = {}
+            for location, (jobs, debug) in zip(LOCATIONS, executor.map(scrape_task, range(1, len(LOCATIONS) + 1), LOCATIONS)):
+                all_results[location] = jobs
+                DEBUG_QUEUE.extend(debug)
+
+    # Overlapping locations return the same postings; keep the first. Jobs
+    # without a link (and so without a job id) are keyed by title and company
+    seen = set()
+    for location, jobs in all_results.items():
+        unique = []
+        for job in jobs:
+            key = job["link"] or (job["title"].lower(), job["company"].lower())
+            if key not in seen:
+                seen.add(key)
+                unique.append(job)
+        all_results[location] = unique
 
     total_time = time.time() - total_start
     total = sum(len(r) for r in all_results.values())
-    
+
     print("\n" + "="*60)
     print(f"FINAL RESULTS")
     print("="*60)
     print(f"Total jobs found: {total}")
     print(f"Total time: {total_time:.1f}s")
     print(f"Locations searched: {len(LOCATIONS)}")
-    
+
     for location, jobs in all_results.items():
         print(f"  {location}: {len(jobs)} jobs")
 
     debug_info = None
     if total == 0:
-        debug_info = "Scraped all locations but found no jobs. Check debug screenshots above."
-    
-    send_to_slack(all_results, debug_info)
+        debug_info = "Scraped all locations but found no jobs. See debug info below."
+
+    # Upload first so the report only mentions screenshots that made it
+    uploaded_screenshots = upload_debug_screenshots()
+    send_to_slack(all_results, debug_info, uploaded_screenshots)
 
     print("\nProcess completed")
 